@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Make the tools shared by the test suites importable from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+
+import pytest_perf
+
+
+def pytest_addoption(parser):
+    pytest_perf.pytest_addoption(parser)
+
+
+def pytest_configure(config):
+    pytest_perf.pytest_configure(config)
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Make the tools shipped alongside the test suite importable from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+
+import pytest_perf
+import standin
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--standin",
+        action="store_true",
+        help="run the tests against a local ResponderAPI stand-in instead of SERVER_HOST",
+    )
+    pytest_perf.pytest_addoption(parser)
+
+
+def pytest_configure(config):
+    pytest_perf.pytest_configure(config)
+
+
+@pytest.fixture(scope="session")
+def standin_host():
+    """host:port of a ResponderAPI stand-in running in a background thread."""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(standin.serve("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def _standin_server_host(request):
+    """With --standin, point SERVER_HOST of the test module at the stand-in."""
+    if request.config.getoption("--standin") and hasattr(request.module, "SERVER_HOST"):
+        monkeypatch = request.getfixturevalue("monkeypatch")
+        monkeypatch.setattr(request.module, "SERVER_HOST", request.getfixturevalue("standin_host"))
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from responderapi_client import AsyncSession, Echo, RequestSpec, Session, StaleConnection, headers_d2l
+
+"""NOTE: These tests exercise the client against the local ResponderAPI stand-in, so they do not
+need a running ResponderAPI.
+"""
+
+
+def test_query_string_matches_documented_encoding():
+    """The query string uses the same base64 encoding as the examples in the README.
+    """
+    spec = (
+        RequestSpec()
+        .with_headers({"Content-Type": "application/whatever"})
+        .with_expected_headers("Content-Type", "Do-We-Care")
+        .with_status_code(500)
+        .without_body()
+    )
+    assert spec.target == (
+        "/?headers=Q29udGVudC1UeXBlOiBhcHBsaWNhdGlvbi93aGF0ZXZlcg=="
+        "&expected_headers=Q29udGVudC1UeXBl,RG8tV2UtQ2FyZQ=="
+        "&status_code=500&no_body"
+    )
+    assert RequestSpec("/fff").with_random_delay(None, 1000).target == "/fff?random_delay=,1000"
+    assert RequestSpec().with_delay(100).target == "/?delay=100"
+    assert RequestSpec().target == "/"
+
+
+def test_headers_d2l():
+    headers = {"Allow": "OPTIONS, GET, HEAD, POST", "Cache-Control": "max-age=604800"}
+    assert ",".join(headers_d2l(headers)) == "QWxsb3c6IE9QVElPTlMsIEdFVCwgSEVBRCwgUE9TVA==,Q2FjaGUtQ29udHJvbDogbWF4LWFnZT02MDQ4MDA="
+
+
+def test_repeated_response_headers(standin_host):
+    spec = RequestSpec().with_headers({"Set-Cookie": "a=1"}).with_headers({"Set-Cookie": "b=2"})
+    encoded = headers_d2l({"Set-Cookie": "a=1"}) + headers_d2l({"Set-Cookie": "b=2"})
+    assert spec.target == "/?headers=" + ",".join(encoded)
+    hostname, _, port = standin_host.rpartition(":")
+    with socket.create_connection((hostname, int(port)), timeout=5) as sock:
+        sock.sendall(spec.with_request_headers({"Connection": "close"}).build_request(standin_host))
+        response = sock.makefile("rb").read()
+    assert b"Set-Cookie: a=1\r\nSet-Cookie: b=2\r\n" in response
+
+
+def test_spec_is_immutable():
+    base = RequestSpec("/blog/page")
+    created = base.with_method("post").with_status_code(201)
+    assert base.method == "GET"
+    assert base.status_code is None
+    assert created.method == "POST"
+    assert created == RequestSpec("/blog/page", method="POST", status_code=201)
+    assert hash(created) == hash(RequestSpec("/blog/page", method="POST", status_code=201))
+
+
+def test_build_request():
+    spec = RequestSpec(method="POST").with_request_body('{"a": 1}')
+    request = spec.build_request("remotehost:8080")
+    assert request.startswith(b"POST / HTTP/1.1\r\nHost: remotehost:8080\r\n")
+    assert b"Content-Length: 8\r\n\r\n" in request
+    assert request.endswith(b'{"a": 1}')
+    assert spec.build_request("remotehost:8080") is request
+
+    request = RequestSpec().with_request_headers({"User-Agent": "Just Mocking it/1.9"}).build_request("remotehost:8080")
+    assert request.count(b"User-Agent") == 1
+
+
+def test_echo_is_decoded_lazily():
+    echo = Echo(b"not json")
+    assert echo.raw == b"not json"
+
+    echo = Echo(json.dumps({
+        "method": "POST",
+        "request_body": "eyJwYXlsb2FkIjogIlJlcXVlc3QgYm9keSJ9",
+        "params": {"random_delay": {}},
+        "execution_time": "12",
+    }).encode("utf-8"))
+    assert echo.method == "POST"
+    assert echo.request_body == b'{"payload": "Request body"}'
+    assert echo.params == {"random_delay": {}}
+    assert echo.execution_time == 12
+    assert echo.found_headers is None
+
+
+def test_session_reuses_connections(standin_host):
+    spec = RequestSpec("/any/url/you/want").with_status_code(201)
+    with Session(standin_host) as session:
+        for _ in range(3):
+            resp = session.send(spec)
+            assert resp.status == 201
+            assert resp.echo.url_path == "/any/url/you/want?status_code=201"
+        assert len(session._idle) == 1
+
+        resp = session.send(spec.with_method("POST").with_request_body(b"Request body"))
+        assert resp.echo.request_body == b"Request body"
+
+        resp = session.send(spec.with_method("HEAD"))
+        assert resp.body == b""
+
+
+def test_async_session(standin_host):
+    async def main():
+        async with AsyncSession(standin_host, connections=4) as session:
+            resps = await asyncio.gather(*(session.send(RequestSpec(f"/{i}")) for i in range(20)))
+            return resps, len(session.pool.idle)
+
+    resps, idle = asyncio.run(main())
+    assert [i.echo.url_path for i in resps] == [f"/{i}" for i in range(20)]
+    assert idle == 4
+
+
+def one_shot_server() -> tuple[str, list]:
+    """A server that answers one request per connection with keep-alive and then closes it, like
+    a load balancer dropping idle connections. Returns its host and the list of requests it got.
+    """
+    listener = socket.create_server(("127.0.0.1", 0))
+    requests = []
+
+    def serve():
+        while True:
+            conn, _ = listener.accept()
+            with conn:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    data += conn.recv(65536)
+                requests.append(data.split(b" ", 1)[0].decode())
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+
+    threading.Thread(target=serve, daemon=True).start()
+    return f"127.0.0.1:{listener.getsockname()[1]}", requests
+
+
+def test_session_retries_idempotent_requests_on_stale_connections():
+    host, requests = one_shot_server()
+    with Session(host) as session:
+        assert session.send(RequestSpec()).status == 200
+        assert session.send(RequestSpec()).status == 200
+        with pytest.raises(StaleConnection):
+            session.send(RequestSpec(method="POST"))
+    assert requests == ["GET", "GET"]
+
+
+def test_async_session_retries_idempotent_requests_on_stale_connections():
+    host, requests = one_shot_server()
+
+    async def main():
+        async with AsyncSession(host, connections=1) as session:
+            assert (await session.send(RequestSpec())).status == 200
+            assert (await session.send(RequestSpec())).status == 200
+            with pytest.raises(StaleConnection):
+                await session.send(RequestSpec(method="POST"))
+
+    asyncio.run(main())
+    assert requests == ["GET", "GET"]
+
+
+def test_timeouts_are_not_retried(standin_host):
+    """A request that times out on a reused connection is not sent again on a new one.
+    """
+    spec = RequestSpec(method="POST").with_delay(1000)
+
+    with Session(standin_host, timeout=0.3) as session:
+        session.send(RequestSpec())
+        started = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            session.send(spec)
+        assert time.perf_counter() - started < 0.6
+
+    async def main():
+        async with AsyncSession(standin_host, connections=1, timeout=0.3) as session:
+            await session.send(RequestSpec())
+            # An alias of TimeoutError since Python 3.11
+            with pytest.raises(asyncio.TimeoutError):
+                await session.send(spec)
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    assert time.perf_counter() - started < 0.6
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import loadgen
+from responderapi_client import RequestSpec
+
+"""NOTE: These tests exercise the load generator against the local ResponderAPI stand-in, so they
+do not need a running ResponderAPI.
+"""
+
+
+def test_arrival_times_constant_rate():
+    offsets = list(loadgen.arrival_times(100, 2))
+    assert len(offsets) == 200
+    assert offsets[1] - offsets[0] == 0.01
+
+
+def test_arrival_times_ramp():
+    """Ramping from 0 to 200 requests per second over 2 seconds averages 100 requests per second.
+    """
+    offsets = list(loadgen.arrival_times(0, 2, ramp_to=200))
+    assert len(offsets) == 200
+    assert offsets[-1] - offsets[-2] < offsets[1] - offsets[0]
+
+
+def test_arrival_times_without_duration():
+    assert list(loadgen.arrival_times(10, 0)) == []
+    assert list(loadgen.arrival_times(10, 0, ramp_to=20)) == []
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["--rate", "10", "--duration", "0"], "--duration must be greater than 0"),
+    (["--rate", "-1"], "--rate and --ramp-to must not be negative"),
+    (["--rate", "0"], "--rate must be greater than 0 unless --ramp-to is set"),
+    (["--rate", "10", "--connections", "0"], "--connections must be at least 1"),
+])
+def test_invalid_arguments(capsys, argv, message):
+    with pytest.raises(SystemExit) as e:
+        loadgen.main(argv)
+    assert e.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_percentile():
+    values = sorted(float(i) for i in range(1, 1001))
+    assert loadgen.percentile(values, 50) == 500
+    assert loadgen.percentile(values, 99.9) == 999
+    assert loadgen.percentile([3.0], 99) == 3
+
+
+def test_sample_corrects_for_coordinated_omission():
+    """A request that waited for a connection is charged for the wait.
+    """
+    sample = loadgen.Sample(intended=10.0, sent=10.5, received=10.6, execution_time=40_000)
+    assert abs(sample.latency - 0.6) < 1e-9
+    assert abs(sample.service_time - 0.1) < 1e-9
+    assert abs(sample.network_time - 0.06) < 1e-9
+
+
+def test_run(standin_host):
+    samples = asyncio.run(
+        loadgen.run(RequestSpec().without_headers(), standin_host, rate=200, duration=0.25, connections=2)
+    )
+    summary = loadgen.summarise(samples, 0.25)
+
+    assert summary["completed"] == 50
+    assert summary["statuses"] == {200: 50}
+    assert summary["server_time"]["p50"] > 0
+    assert all(i.called_at.endswith("Z") for i in samples)
+    assert "latency" in loadgen.format_summary(summary)
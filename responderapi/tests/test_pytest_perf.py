@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+
+import pytest_perf
+
+"""NOTE: pytest_perf lives in the top-level tools folder and is shared by the QRlyAPI and
+ResponderAPI test suites. The end-to-end test runs a small test file against the local
+ResponderAPI stand-in.
+"""
+
+TEST_FILE = '''
+import http.client
+import io
+import os
+import shutil
+
+import requests
+
+def test_requests():
+    resp = requests.get(f"http://{os.environ['RESPONDERAPI_HOST']}/?delay={os.environ['DELAY']}")
+    assert resp.status_code == 200
+
+def test_requests_stream():
+    resp = requests.get(f"http://{os.environ['RESPONDERAPI_HOST']}/?delay={os.environ['DELAY']}", stream=True)
+    body = io.BytesIO()
+    shutil.copyfileobj(resp.raw, body)
+    assert body.getvalue().startswith(b"{")
+
+def test_http_client():
+    conn = http.client.HTTPConnection(os.environ["RESPONDERAPI_HOST"])
+    conn.request("GET", f"/?delay={os.environ['DELAY']}")
+    resp = conn.getresponse()
+    assert resp.status == 200
+    assert resp.read().startswith(b"{")
+    conn.request("HEAD", "/")
+    assert conn.getresponse().status == 200
+    conn.close()
+'''
+
+
+def run_pytest(path, host: str, delay: int, *args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, RESPONDERAPI_HOST=host, DELAY=str(delay), PYTHONPATH=os.path.dirname(pytest_perf.__file__))
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "pytest_perf", "--perf", *args, str(path)],
+        cwd=path.parent, env=env, capture_output=True, text=True,
+    )
+
+
+def test_summarise():
+    summary = pytest_perf.summarise([i / 1000 for i in range(100, 0, -1)])
+    assert summary == {"p50": 0.05, "p95": 0.095, "count": 100}
+    assert pytest_perf.summarise([]) is None
+
+
+def test_compare():
+    baseline = {"test_a": {"client": {"p50": 0.010, "p95": 0.020, "count": 5}, "server": None}}
+    faster = {"test_a": {"client": {"p50": 0.009, "p95": 0.021, "count": 5}, "server": None}}
+    slower = {"test_a": {"client": {"p50": 0.015, "p95": 0.020, "count": 5}, "server": None}}
+    assert pytest_perf.compare(faster, baseline, threshold=0.2, min_delta=1.0) == []
+    assert pytest_perf.compare(slower, baseline, threshold=0.2, min_delta=1.0) == [
+        "test_a client p50: 15.000ms (baseline 10.000ms, +50%)"
+    ]
+    assert pytest_perf.compare(slower, baseline, threshold=0.2, min_delta=10.0) == []
+    assert pytest_perf.compare({"test_b": slower["test_a"]}, baseline, threshold=0.2, min_delta=1.0) == []
+
+
+def test_server_time():
+    assert pytest_perf.server_time(b'{"execution_time": 1500}') == 0.0015
+    assert pytest_perf.server_time(b'{"execution_time": "12"}') == 0.000012
+    assert pytest_perf.server_time(b"\x89PNG") is None
+    assert pytest_perf.server_time(b"{not json") is None
+
+
+def test_baseline_and_regression(tmp_path, standin_host):
+    path = tmp_path / "test_sample.py"
+    path.write_text(TEST_FILE)
+
+    result = run_pytest(path, standin_host, 10, "--perf-save", "--perf-repeat", "3")
+    assert result.returncode == 0, result.stdout
+    assert "test_sample.py::test_requests  client p50" in result.stdout
+    assert "test_sample.py::test_http_client  client p50" in result.stdout
+    assert "passed" in result.stdout
+    assert (tmp_path / ".perf_baseline.json").exists()
+
+    result = run_pytest(path, standin_host, 10, "--perf-repeat", "3", "--perf-min-delta", "20")
+    assert result.returncode == 0, result.stdout
+
+    result = run_pytest(path, standin_host, 100, "--perf-repeat", "3")
+    assert result.returncode == 1, result.stdout
+    assert "REGRESSION test_sample.py::test_requests server p50" in result.stdout
+    assert "REGRESSION test_sample.py::test_requests_stream server p50" in result.stdout
+    assert "REGRESSION test_sample.py::test_http_client server p50" in result.stdout
+
+
+def test_failed_run_is_not_saved(tmp_path, standin_host):
+    path = tmp_path / "test_sample.py"
+    path.write_text(TEST_FILE + "\ndef test_failure():\n    assert False\n")
+
+    result = run_pytest(path, standin_host, 10, "--perf-save")
+    assert result.returncode == 1, result.stdout
+    assert "baseline not saved because the tests did not pass" in result.stdout
+    assert not (tmp_path / ".perf_baseline.json").exists()
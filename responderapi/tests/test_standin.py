@@ -0,0 +1,220 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from responderapi_client import AsyncSession, RequestSpec, Session
+import standin
+
+"""NOTE: test_responderapi.py covers the documented behaviour of the stand-in when run with
+`pytest --standin`. The tests below cover the parts that are specific to the stand-in: request
+parsing, keep-alive and pipelining, non-blocking delays and server-side assertions.
+"""
+
+
+def raw_exchange(host: str, request: bytes) -> bytes:
+    hostname, _, port = host.rpartition(":")
+    with socket.create_connection((hostname, int(port)), timeout=5) as sock:
+        sock.sendall(request)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_invalid_status_code(standin_host):
+    with Session(standin_host) as session:
+        resp = session.send(RequestSpec("/fff?status_code=290a"))
+    assert resp.status == 400
+    assert resp.headers["content-type"] == "text/plain; charset=utf-8"
+    assert resp.text == "Error: Invalid HTTP status code: 290a"
+
+
+@pytest.mark.parametrize("query_string", ["delay=abc", "random_delay=300,200", "headers=not-base64!", "body=%%%"])
+def test_invalid_params(query_string):
+    with pytest.raises(standin.BadRequest):
+        standin.parse_params(query_string)
+
+
+@pytest.mark.parametrize("request_", [
+    b"GET /?status_code=%C2%B2 HTTP/1.1\r\nHost: standin\r\nConnection: close\r\n\r\n",
+    b"POST / HTTP/1.1\r\nHost: standin\r\nContent-Length: \xb2\r\n\r\n",
+    b"POST / HTTP/1.1\r\nHost: standin\r\nTransfer-Encoding: chunked\r\n\r\n-5\r\nHello\r\n0\r\n\r\n",
+])
+def test_non_ascii_and_negative_numbers(standin_host, request_):
+    response = raw_exchange(standin_host, request_)
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+
+
+def test_unexpected_errors(standin_host, monkeypatch):
+    """A request that fails unexpectedly is answered with 500, with or without a delay.
+    """
+    def broken(*args):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(standin, "build_response", broken)
+    for target in (b"/", b"/?delay=10"):
+        response = raw_exchange(standin_host, b"GET " + target + b" HTTP/1.1\r\nHost: standin\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 500 Internal Server Error\r\n")
+        assert response.endswith(b"Error: Internal server error")
+
+
+def test_random_delay_params():
+    assert standin.parse_params("random_delay=200,300").random_delay == {"min": 200, "max": 300}
+    assert standin.parse_params("random_delay=,1000").random_delay == {"max": 1000}
+    assert standin.parse_params("random_delay=1000").random_delay == {"max": 1000}
+    assert standin.parse_params("").random_delay == {}
+
+
+def test_params_are_cached():
+    assert standin.parse_params("status_code=500&no_body") is standin.parse_params("status_code=500&no_body")
+
+
+def test_custom_content_length(standin_host):
+    """A Content-Length set with the `headers` param replaces the one ResponderAPI would send.
+    """
+    spec = RequestSpec().with_headers({"Content-Length": 0}).without_body()
+    with Session(standin_host) as session:
+        resp = session.send(spec)
+    assert resp.headers["content-length"] == "0"
+    assert resp.body == b""
+
+
+def test_no_headers_keeps_content_type_with_body(standin_host):
+    with Session(standin_host) as session:
+        resp = session.send(RequestSpec().with_headers({"Server": "ResponderAPI 2024-003"}).without_headers())
+    assert sorted(resp.headers) == ["content-length", "content-type", "date"]
+
+
+def test_chunked_request_body(standin_host):
+    request = (
+        b"POST /upload HTTP/1.1\r\nHost: standin\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+        b"5\r\nHello\r\n7\r\n, world\r\n0\r\n\r\n"
+    )
+    response = raw_exchange(standin_host, request)
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b'"content_length":12,"request_body":"SGVsbG8sIHdvcmxk"' in response
+
+
+def test_pipelined_requests_are_answered_in_order(standin_host):
+    request = b"GET /first?delay=100&body=Zmlyc3Q= HTTP/1.1\r\nHost: standin\r\n\r\n"
+    request += b"GET /second?body=c2Vjb25k HTTP/1.1\r\nHost: standin\r\nConnection: close\r\n\r\n"
+    response = raw_exchange(standin_host, request)
+    assert response.count(b"HTTP/1.1 200 OK") == 2
+    assert response.endswith(b"second")
+    assert response.index(b"first") < response.index(b"second")
+
+
+def test_long_pipeline(standin_host):
+    """A thousand requests in one write are all answered, including the ones queued behind a delay.
+    """
+    request = b"GET /?no_body HTTP/1.1\r\nHost: standin\r\n\r\n" * 500
+    request += b"GET /?delay=50&no_body HTTP/1.1\r\nHost: standin\r\n\r\n"
+    request += b"GET /?no_body HTTP/1.1\r\nHost: standin\r\n\r\n" * 498
+    request += b"GET /?body=bGFzdA== HTTP/1.1\r\nHost: standin\r\nConnection: close\r\n\r\n"
+    response = raw_exchange(standin_host, request)
+    assert response.count(b"HTTP/1.1 200 OK") == 1000
+    assert response.endswith(b"last")
+
+
+def test_requests_after_connection_close_are_ignored(standin_host):
+    request = b"GET /?no_body HTTP/1.1\r\nHost: standin\r\nConnection: close\r\n\r\n"
+    request += b"GET /?no_body HTTP/1.1\r\nHost: standin\r\n\r\n"
+    response = raw_exchange(standin_host, request)
+    assert response.count(b"HTTP/1.1 200 OK") == 1
+
+
+def test_http_1_0_closes_connection(standin_host):
+    response = raw_exchange(standin_host, b"GET /?no_body HTTP/1.0\r\nHost: standin\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert response.endswith(b"Content-Length: 0\r\n\r\n")
+
+
+def test_delays_do_not_block(standin_host):
+    """One hundred requests delayed by 200ms each complete in well under a second.
+    """
+    async def main():
+        async with AsyncSession(standin_host, connections=100) as session:
+            return await asyncio.gather(*(session.send(RequestSpec(f"/{i}").with_delay(200)) for i in range(100)))
+
+    started = time.perf_counter()
+    resps = asyncio.run(main())
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert all(i.echo.execution_time >= 200_000 for i in resps)
+
+
+def test_assertions(standin_host):
+    body = '{"payload": "Request body"}'
+    spec = (
+        RequestSpec("/upload", method="POST")
+        .with_assert_headers({"X-Request-Id": None, "X-Tenant": "acme"})
+        .with_assert_no_headers("Authorization")
+        .with_assert_method("POST")
+        .with_assert_content_type("application/json")
+        .with_assert_body(body)
+        .without_body()
+    )
+    good = spec.with_request_headers(
+        {"X-Request-Id": "1", "X-Tenant": "acme", "Content-Type": "application/json"}
+    ).with_request_body(body)
+
+    with Session(standin_host) as session:
+        session.send(RequestSpec(standin.ASSERTIONS_PATH + "?reset"))
+
+        resp = session.send(good)
+        assert resp.status == 200
+        assert "x-responder-assert" not in resp.headers
+
+        resp = session.send(good.with_request_headers({"Authorization": "Bearer token"}))
+        assert resp.status == 417
+        assert resp.headers["x-responder-assert"] == "forbidden header Authorization"
+
+        resp = session.send(good.with_request_body("something else").with_assert_status(412))
+        assert resp.status == 412
+        assert resp.headers["x-responder-assert"] == "body sha256 mismatch"
+
+        resp = session.send(spec.with_request_body(body))
+        assert resp.status == 417
+        assert resp.headers["x-responder-assert"] == "missing header X-Request-Id"
+
+        resp = session.send(good.with_method("PUT").with_assert_status(200).with_body("{}"))
+        assert resp.status == 200
+        assert resp.headers["x-responder-assert"] == "method PUT != POST"
+
+        counts = session.send(RequestSpec(standin.ASSERTIONS_PATH + "?reset")).echo.data
+        assert counts["matched"] == 1
+        assert counts["mismatched"] == 4
+        assert counts["reasons"] == {
+            "forbidden header Authorization": 1, "body sha256": 1, "header X-Request-Id": 1, "method": 1,
+        }
+
+        assert session.send(RequestSpec(standin.ASSERTIONS_PATH)).echo["matched"] == 0
+
+
+def test_assertion_reasons_are_bounded(standin_host, monkeypatch):
+    """Mismatches are counted by category, not by the header values each request sent.
+    """
+    monkeypatch.setattr(standin, "MAX_ASSERTION_REASONS", 2)
+    spec = RequestSpec().with_assert_headers({"X-Tenant": "acme"})
+    with Session(standin_host) as session:
+        session.send(RequestSpec(standin.ASSERTIONS_PATH + "?reset"))
+        for i in range(50):
+            resp = session.send(spec.with_request_headers({"X-Tenant": f"tenant-{i}"}))
+            assert resp.headers["x-responder-assert"] == f"header X-Tenant: tenant-{i} != acme"
+        for name in ("X-A", "X-B"):
+            session.send(RequestSpec().with_assert_headers({name: None}))
+        counts = session.send(RequestSpec(standin.ASSERTIONS_PATH + "?reset")).echo.data
+    assert counts["reasons"] == {"header X-Tenant": 50, "header X-A": 1, "other": 1}
+
+
+def test_assertion_params_are_echoed(standin_host):
+    spec = RequestSpec().with_assert_headers({"X-Tenant": "acme"}).with_assert_status(409)
+    with Session(standin_host) as session:
+        resp = session.send(spec)
+    assert resp.status == 409
+    assert resp.echo["assertion"] == "missing header X-Tenant"
+    assert resp.echo.params["assert_headers"] == ["X-Tenant: acme"]
+    assert resp.echo.params["assert_status"] == 409
@@ -0,0 +1,304 @@
+"""Open-loop load generator for ResponderAPI.
+
+Sends requests at a constant or linearly ramping arrival rate over a pool of keep-alive
+connections and reports latency percentiles. Each request is timed from the moment it was
+*scheduled* to be sent, not from the moment a connection became free, so a slow server (or a
+slow gateway in front of it) cannot hide its queueing delay from the results (coordinated
+omission). When ResponderAPI returns its JSON echo, the reported `execution_time` is used to
+split client-observed time into server time and everything else (network, proxies, load
+balancers).
+
+Only the Python standard library is used:
+
+    $ python loadgen.py --host remotehost:8080 --rate 500 --duration 30 --connections 64
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import math
+import os
+import sys
+import time
+
+from responderapi_client import RequestSpec, Response
+from responderapi_client.aio import AsyncConnectionPool
+
+# percentile() is shared with the pytest plugin in the top-level tools folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+from perf_stats import percentile
+
+DEFAULT_HOST = "remotehost:8080"
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# ----------------------------------------------------------------
+# Arrivals
+# ----------------------------------------------------------------
+
+def arrival_times(rate: float, duration: float, ramp_to: float | None = None):
+    """Yield send offsets in seconds for a constant arrival rate, or one that changes linearly
+    from `rate` to `ramp_to` requests per second over `duration` seconds.
+    """
+    if duration <= 0:
+        return
+    end_rate = rate if ramp_to is None else ramp_to
+    # N(t) = rate * t + (end_rate - rate) * t^2 / (2 * duration), solved for t at N = i
+    a = (end_rate - rate) / (2 * duration)
+    i = 0
+    while True:
+        if a == 0:
+            offset = i / rate if rate > 0 else math.inf
+        else:
+            discriminant = rate * rate + 4 * a * i
+            if discriminant < 0:
+                return
+            offset = (-rate + math.sqrt(discriminant)) / (2 * a)
+        if offset >= duration:
+            return
+        yield offset
+        i += 1
+
+
+# ----------------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------------
+
+@dataclass
+class Sample:
+    """Timings of a single request. Monotonic times are in seconds, `execution_time` is in
+    microseconds as reported by ResponderAPI.
+    """
+    intended: float
+    sent: float | None = None
+    received: float | None = None
+    sent_at: float | None = None
+    status: int | None = None
+    execution_time: int | None = None
+    called_at: str | None = None
+    error: str | None = None
+
+    @property
+    def latency(self) -> float | None:
+        """Time from the scheduled send to the response, corrected for coordinated omission."""
+        return None if self.received is None else self.received - self.intended
+
+    @property
+    def service_time(self) -> float | None:
+        """Time from the actual send to the response."""
+        return None if self.received is None else self.received - self.sent
+
+    @property
+    def server_time(self) -> float | None:
+        return None if self.execution_time is None else self.execution_time / 1_000_000
+
+    @property
+    def network_time(self) -> float | None:
+        if self.service_time is None or self.server_time is None:
+            return None
+        return max(self.service_time - self.server_time, 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "sent_at": self.sent_at,
+            "status": self.status,
+            "latency": self.latency,
+            "service_time": self.service_time,
+            "server_time": self.server_time,
+            "network_time": self.network_time,
+            "execution_time": self.execution_time,
+            "called_at": self.called_at,
+            "error": self.error,
+        }
+
+
+def read_echo(sample: Sample, resp: Response):
+    """Copy `execution_time` and `called_at` from a ResponderAPI JSON echo into the sample.
+    Custom and empty bodies are ignored.
+    """
+    if not resp.body.startswith(b"{"):
+        return
+    try:
+        sample.execution_time = resp.echo.execution_time
+        sample.called_at = resp.echo.called_at
+    except (ValueError, TypeError, AttributeError):
+        return
+
+
+# ----------------------------------------------------------------
+# Running a load test
+# ----------------------------------------------------------------
+
+async def run(spec: RequestSpec, host: str, rate: float, duration: float, connections: int = 64,
+              ramp_to: float | None = None, timeout: float = 30.0) -> list[Sample]:
+    hostname, _, port = host.rpartition(":")
+    pool = AsyncConnectionPool(hostname, int(port), connections)
+    request = spec.build_request(host)
+    head_only = spec.method == "HEAD"
+    loop = asyncio.get_running_loop()
+
+    async def send(sample: Sample):
+        conn = None
+        try:
+            conn, _ = await pool.acquire()
+            sample.sent = loop.time()
+            sample.sent_at = time.time()
+            resp = await asyncio.wait_for(conn.exchange(request, head_only), timeout)
+            sample.received = loop.time()
+            sample.status = resp.status
+            read_echo(sample, resp)
+            pool.release(conn)
+        except Exception as e:
+            sample.error = f"{type(e).__name__}: {e}"
+            if conn is not None:
+                pool.discard(conn)
+
+    samples = []
+    tasks = []
+    start = loop.time()
+    for offset in arrival_times(rate, duration, ramp_to):
+        intended = start + offset
+        wait = intended - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        sample = Sample(intended=intended)
+        samples.append(sample)
+        tasks.append(asyncio.create_task(send(sample)))
+    await asyncio.gather(*tasks)
+    pool.close()
+    return samples
+
+
+def summarise(samples: list[Sample], duration: float) -> dict:
+    completed = [i for i in samples if i.received is not None]
+    statuses = {}
+    for i in completed:
+        statuses[i.status] = statuses.get(i.status, 0) + 1
+    summary = {
+        "scheduled": len(samples),
+        "completed": len(completed),
+        "errors": len(samples) - len(completed),
+        "rate": len(completed) / duration if duration else 0.0,
+        "statuses": statuses,
+    }
+    for name in ("latency", "service_time", "server_time", "network_time"):
+        values = sorted(v for v in (getattr(i, name) for i in completed) if v is not None)
+        if values:
+            summary[name] = {f"p{p:g}": percentile(values, p) for p in PERCENTILES}
+            summary[name]["max"] = values[-1]
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        f"scheduled: {summary['scheduled']}  completed: {summary['completed']}  errors: {summary['errors']}  "
+        f"rate: {summary['rate']:.1f}/s",
+        "statuses: " + ", ".join(f"{k}: {v}" for k, v in sorted(summary["statuses"].items())),
+        "",
+        f"{'(ms)':<14}" + "".join(f"{f'p{p:g}':>10}" for p in PERCENTILES) + f"{'max':>10}",
+    ]
+    for name in ("latency", "service_time", "server_time", "network_time"):
+        if name in summary:
+            row = summary[name]
+            lines.append(f"{name:<14}" + "".join(f"{row[k] * 1000:>10.3f}" for k in row))
+    return "\n".join(lines)
+
+
+# ----------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------
+
+def parse_header(value: str) -> tuple[str, str]:
+    name, sep, header_value = value.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Invalid header: {value}. Use 'Name: value'")
+    return name.strip(), header_value.strip()
+
+
+def parse_random_delay(value: str) -> tuple[int | None, int | None]:
+    low, sep, high = value.partition(",")
+    if not sep:
+        return None, int(low)
+    return (int(low) if low else None), (int(high) if high else None)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=DEFAULT_HOST, help="ResponderAPI host and port")
+    parser.add_argument("--rate", type=float, required=True, help="arrival rate in requests per second")
+    parser.add_argument("--ramp-to", type=float, help="ramp the arrival rate linearly up (or down) to this rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="test duration in seconds")
+    parser.add_argument("--connections", type=int, default=64, help="maximum number of keep-alive connections")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--output", help="write per-request timings to this file as JSON lines")
+
+    request = parser.add_argument_group("request")
+    request.add_argument("--method", default="GET")
+    request.add_argument("--path", default="/")
+    request.add_argument("--request-header", type=parse_header, action="append", default=[])
+    request.add_argument("--data", default="", help="request body")
+
+    params = parser.add_argument_group("ResponderAPI query params")
+    params.add_argument("--delay", type=int)
+    params.add_argument("--random-delay", type=parse_random_delay, metavar="MIN,MAX")
+    params.add_argument("--header", type=parse_header, action="append", default=[], help="response header")
+    params.add_argument("--expected-header", action="append", default=[])
+    params.add_argument("--status-code", type=int)
+    params.add_argument("--body", help="response body")
+    params.add_argument("--no-body", action="store_true")
+    params.add_argument("--no-headers", action="store_true")
+
+    assertions = parser.add_argument_group("server-side assertions (local ResponderAPI stand-in only)")
+    assertions.add_argument("--assert-header", action="append", default=[], help="'Name' or 'Name: value'")
+    assertions.add_argument("--assert-no-header", action="append", default=[])
+    assertions.add_argument("--assert-method")
+    assertions.add_argument("--assert-content-type")
+    assertions.add_argument("--assert-body-sha256")
+    assertions.add_argument("--assert-status", type=int, help="status code of mismatched requests")
+    args = parser.parse_args(argv)
+    if args.duration <= 0:
+        parser.error("--duration must be greater than 0")
+    if args.rate < 0 or (args.ramp_to is not None and args.ramp_to < 0):
+        parser.error("--rate and --ramp-to must not be negative")
+    if args.rate == 0 and not args.ramp_to:
+        parser.error("--rate must be greater than 0 unless --ramp-to is set")
+    if args.connections < 1:
+        parser.error("--connections must be at least 1")
+
+    spec = RequestSpec(
+        path=args.path,
+        method=args.method.upper(),
+        delay=args.delay,
+        random_delay=args.random_delay,
+        headers=tuple(args.header),
+        expected_headers=tuple(args.expected_header),
+        status_code=args.status_code,
+        body=None if args.body is None else args.body.encode("utf-8"),
+        no_body=args.no_body,
+        no_headers=args.no_headers,
+        request_headers=tuple(args.request_header),
+        request_body=args.data.encode("utf-8"),
+        assert_headers=tuple(args.assert_header),
+        assert_no_headers=tuple(args.assert_no_header),
+        assert_method=None if args.assert_method is None else args.assert_method.upper(),
+        assert_content_type=args.assert_content_type,
+        assert_body_sha256=args.assert_body_sha256,
+        assert_status=args.assert_status,
+    )
+    samples = asyncio.run(
+        run(spec, args.host, args.rate, args.duration, args.connections, args.ramp_to, args.timeout)
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            for i in samples:
+                file.write(json.dumps(i.to_dict()) + "\n")
+
+    print(f"{datetime.now().isoformat()} {spec.method} {args.host}{spec.target}")
+    print(format_summary(summarise(samples, args.duration)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
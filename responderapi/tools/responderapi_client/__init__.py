@@ -0,0 +1,13 @@
+"""Python client for ResponderAPI.
+
+Build a `RequestSpec` once, send it many times with a `Session` (blocking) or an
+`AsyncSession` (asyncio). Both keep connections alive between requests and return a
+`Response` whose JSON echo is only decoded when you read it.
+"""
+from .aio import AsyncSession
+from .echo import Echo, Response
+from .session import Session
+from .spec import RequestSpec, headers_d2l
+from .wire import StaleConnection
+
+__all__ = ["AsyncSession", "Echo", "RequestSpec", "Response", "Session", "StaleConnection", "headers_d2l"]
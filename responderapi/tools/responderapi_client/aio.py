@@ -0,0 +1,146 @@
+"""Asyncio ResponderAPI session with keep-alive connection pooling."""
+import asyncio
+
+from .echo import Response
+from .spec import RequestSpec
+from .wire import (
+    CHUNKED, IDEMPOTENT_METHODS, LENGTH, NO_BODY, StaleConnection, body_framing, keeps_alive, parse_head,
+)
+
+
+class AsyncConnection:
+    """An asyncio keep-alive HTTP/1.1 connection that sends prebuilt requests one at a time.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> "AsyncConnection":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def exchange(self, request: bytes, head_only: bool = False) -> Response:
+        try:
+            self.writer.write(request)
+            head = await self.reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise
+            raise StaleConnection("Connection closed by ResponderAPI") from e
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise StaleConnection("Connection closed by ResponderAPI") from e
+        status, headers = parse_head(head)
+        framing, length = body_framing(status, headers, head_only)
+
+        if framing == NO_BODY:
+            body = b""
+        elif framing == LENGTH:
+            body = await self.reader.readexactly(length)
+        elif framing == CHUNKED:
+            body = await self._read_chunked()
+        else:
+            body = await self.reader.read()
+
+        if not keeps_alive(headers, framing):
+            self.close()
+        return Response(status, headers, body)
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await self.reader.readuntil(b"\r\n")
+                return b"".join(chunks)
+            chunks.append((await self.reader.readexactly(size + 2))[:-2])
+
+    def close(self):
+        self.closed = True
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """Up to `size` connections opened on demand and reused between requests.
+    """
+
+    def __init__(self, host: str, port: int, size: int):
+        self.host = host
+        self.port = port
+        self.slots = asyncio.Semaphore(size)
+        self.idle: list[AsyncConnection] = []
+
+    async def acquire(self, fresh: bool = False) -> tuple[AsyncConnection, bool]:
+        """Return a connection and whether it has been used before. A `fresh` connection is
+        always newly opened.
+        """
+        await self.slots.acquire()
+        if self.idle and not fresh:
+            return self.idle.pop(), True
+        try:
+            return await AsyncConnection.open(self.host, self.port), False
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, conn: AsyncConnection):
+        if not conn.closed:
+            self.idle.append(conn)
+        self.slots.release()
+
+    def discard(self, conn: AsyncConnection):
+        conn.close()
+        self.release(conn)
+
+    def close(self):
+        while self.idle:
+            self.idle.pop().close()
+
+
+class AsyncSession:
+    """Sends request specs to one ResponderAPI host over at most `connections` keep-alive
+    connections.
+
+        async with AsyncSession("remotehost:8080") as session:
+            resps = await asyncio.gather(*(session.send(spec) for _ in range(100)))
+    """
+
+    def __init__(self, host: str, connections: int = 64, timeout: float | None = 30.0):
+        self.host = host
+        hostname, _, port = host.rpartition(":")
+        self.pool = AsyncConnectionPool(hostname, int(port), connections)
+        self.timeout = timeout
+
+    async def send(self, spec: RequestSpec) -> Response:
+        request = spec.build_request(self.host)
+        head_only = spec.method == "HEAD"
+        conn, reused = await self.pool.acquire()
+        try:
+            resp = await asyncio.wait_for(conn.exchange(request, head_only), self.timeout)
+        except StaleConnection:
+            self.pool.discard(conn)
+            if not reused or spec.method not in IDEMPOTENT_METHODS:
+                raise
+            # The server closed an idle keep-alive connection; try once more on a fresh one
+            conn, _ = await self.pool.acquire(fresh=True)
+            try:
+                resp = await asyncio.wait_for(conn.exchange(request, head_only), self.timeout)
+            except BaseException:
+                self.pool.discard(conn)
+                raise
+        except BaseException:
+            self.pool.discard(conn)
+            raise
+        self.pool.release(conn)
+        return resp
+
+    async def close(self):
+        self.pool.close()
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
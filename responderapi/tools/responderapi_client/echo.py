@@ -0,0 +1,118 @@
+"""ResponderAPI responses and the lazily decoded JSON echo."""
+import base64
+import json
+
+
+class Echo:
+    """The JSON payload ResponderAPI returns when neither `body` nor `no_body` is used.
+
+    The payload is only decoded when one of its attributes is first read. Attributes that
+    ResponderAPI leaves out (see release 1.0.4) are returned as `None`.
+    """
+
+    __slots__ = ("raw", "_data")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._data = None
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = json.loads(self.raw)
+        return self._data
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self.data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    @property
+    def protocol(self) -> str | None:
+        return self.data.get("protocol")
+
+    @property
+    def method(self) -> str | None:
+        return self.data.get("method")
+
+    @property
+    def user_agent(self) -> str | None:
+        return self.data.get("user_agent")
+
+    @property
+    def client_address(self) -> str | None:
+        return self.data.get("client_address")
+
+    @property
+    def host(self) -> str | None:
+        return self.data.get("host")
+
+    @property
+    def url_path(self) -> str | None:
+        return self.data.get("url_path")
+
+    @property
+    def content_type(self) -> str | None:
+        return self.data.get("content_type")
+
+    @property
+    def content_length(self) -> int | None:
+        return self.data.get("content_length")
+
+    @property
+    def request_body(self) -> bytes | None:
+        """The request body as received by ResponderAPI, base64 decoded."""
+        request_body = self.data.get("request_body")
+        return None if request_body is None else base64.b64decode(request_body)
+
+    @property
+    def found_headers(self) -> list[str] | None:
+        return self.data.get("found_headers")
+
+    @property
+    def params(self) -> dict:
+        return self.data.get("params") or {}
+
+    @property
+    def responderapi_id(self) -> str | None:
+        return self.data.get("responderapi_id")
+
+    @property
+    def called_at(self) -> str | None:
+        return self.data.get("called_at")
+
+    @property
+    def execution_time(self) -> int | None:
+        """Request processing time in microseconds."""
+        execution_time = self.data.get("execution_time")
+        return None if execution_time is None else int(execution_time)
+
+
+class Response:
+    """A response received from ResponderAPI. Header names are lower case.
+    """
+
+    __slots__ = ("status", "headers", "body", "_echo")
+
+    def __init__(self, status: int, headers: dict, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self._echo = None
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+    @property
+    def echo(self) -> Echo:
+        if self._echo is None:
+            self._echo = Echo(self.body)
+        return self._echo
+
+    def __repr__(self) -> str:
+        return f"<Response [{self.status}]>"
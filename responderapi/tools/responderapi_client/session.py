@@ -0,0 +1,140 @@
+"""Blocking ResponderAPI session with keep-alive connection pooling."""
+import socket
+import threading
+
+from .echo import Response
+from .spec import RequestSpec
+from .wire import (
+    CHUNKED, IDEMPOTENT_METHODS, LENGTH, NO_BODY, StaleConnection, body_framing, keeps_alive, parse_head,
+)
+
+
+class Connection:
+    """A blocking keep-alive HTTP/1.1 connection that sends prebuilt requests one at a time.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float | None = None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+        self.closed = False
+
+    def exchange(self, request: bytes, head_only: bool = False) -> Response:
+        try:
+            self.sock.sendall(request)
+            line = self.rfile.readline(65537)
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise StaleConnection("Connection closed by ResponderAPI") from e
+        if not line:
+            raise StaleConnection("Connection closed by ResponderAPI")
+        lines = [line]
+        while line != b"\r\n":
+            line = self.rfile.readline(65537)
+            if not line:
+                raise ConnectionError("Connection closed by ResponderAPI")
+            lines.append(line)
+        status, headers = parse_head(b"".join(lines))
+        framing, length = body_framing(status, headers, head_only)
+
+        if framing == NO_BODY:
+            body = b""
+        elif framing == LENGTH:
+            body = self._read_exactly(length)
+        elif framing == CHUNKED:
+            body = self._read_chunked()
+        else:
+            body = self.rfile.read()
+
+        if not keeps_alive(headers, framing):
+            self.close()
+        return Response(status, headers, body)
+
+    def _read_exactly(self, length: int) -> bytes:
+        data = self.rfile.read(length)
+        if len(data) < length:
+            raise ConnectionError("Connection closed by ResponderAPI")
+        return data
+
+    def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if size == 0:
+                self.rfile.readline()
+                return b"".join(chunks)
+            chunks.append(self._read_exactly(size + 2)[:-2])
+
+    def close(self):
+        self.closed = True
+        self.rfile.close()
+        self.sock.close()
+
+
+class Session:
+    """Sends request specs to one ResponderAPI host over pooled keep-alive connections.
+
+        with Session("remotehost:8080") as session:
+            resp = session.send(RequestSpec("/").with_status_code(201))
+            assert resp.echo.params["status_code"] == 201
+
+    A session can be shared between threads; each thread borrows its own connection.
+    """
+
+    def __init__(self, host: str, maxsize: int = 10, timeout: float | None = 30.0):
+        self.host = host
+        self.hostname, _, port = host.rpartition(":")
+        self.port = int(port)
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle: list[Connection] = []
+        self._lock = threading.Lock()
+
+    def send(self, spec: RequestSpec) -> Response:
+        request = spec.build_request(self.host)
+        head_only = spec.method == "HEAD"
+        conn, reused = self._acquire()
+        try:
+            resp = conn.exchange(request, head_only)
+        except StaleConnection:
+            conn.close()
+            if not reused or spec.method not in IDEMPOTENT_METHODS:
+                raise
+            # The server closed an idle keep-alive connection; try once more on a fresh one
+            conn = Connection(self.hostname, self.port, self.timeout)
+            try:
+                resp = conn.exchange(request, head_only)
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn)
+        return resp
+
+    def _acquire(self) -> tuple[Connection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return Connection(self.hostname, self.port, self.timeout), False
+
+    def _release(self, conn: Connection):
+        if conn.closed:
+            return
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,175 @@
+"""Immutable ResponderAPI request specs compiled into raw HTTP/1.1 requests."""
+import base64
+from dataclasses import dataclass, replace
+from functools import cached_property, lru_cache
+import hashlib
+
+USER_AGENT = "responderapi-client/1.0"
+METHODS_WITH_BODY = ("POST", "PUT", "PATCH")
+
+
+def headers_d2l(headers_dict: dict) -> list[str]:
+    return headers_p2l(headers_dict.items())
+
+
+def headers_p2l(headers_pairs) -> list[str]:
+    """Like headers_d2l, for (name, value) pairs; a header may appear more than once."""
+    return [base64.b64encode(f"{k}: {v}".encode("utf-8")).decode("utf-8") for k, v in headers_pairs]
+
+
+@dataclass(frozen=True)
+class RequestSpec:
+    """A ResponderAPI request: the request line, request headers and body, and the query params
+    that tell ResponderAPI how to respond.
+
+    Specs are immutable and hashable. The `with_*` methods return a modified copy, so a base spec
+    can be shared between tests. The query string and the request bytes are computed once per
+    spec (and host) and reused for every request sent with it.
+
+        spec = RequestSpec("/blog/page").with_status_code(201).with_headers({"Content-Type": "application/json"})
+    """
+    path: str = "/"
+    method: str = "GET"
+    delay: int | None = None
+    random_delay: tuple[int | None, int | None] | None = None
+    headers: tuple[tuple[str, str], ...] = ()
+    expected_headers: tuple[str, ...] = ()
+    status_code: int | None = None
+    body: bytes | None = None
+    no_body: bool = False
+    no_headers: bool = False
+    request_headers: tuple[tuple[str, str], ...] = ()
+    request_body: bytes = b""
+    # Server-side assertions, only supported by the local ResponderAPI stand-in
+    assert_headers: tuple[str, ...] = ()
+    assert_no_headers: tuple[str, ...] = ()
+    assert_method: str | None = None
+    assert_content_type: str | None = None
+    assert_body_sha256: str | None = None
+    assert_status: int | None = None
+
+    # ----------------------------------------------------------------
+    # Builders
+    # ----------------------------------------------------------------
+
+    def with_path(self, path: str) -> "RequestSpec":
+        return replace(self, path=path)
+
+    def with_method(self, method: str) -> "RequestSpec":
+        return replace(self, method=method.upper())
+
+    def with_delay(self, delay: int) -> "RequestSpec":
+        return replace(self, delay=delay)
+
+    def with_random_delay(self, min_delay: int | None, max_delay: int | None) -> "RequestSpec":
+        return replace(self, random_delay=(min_delay, max_delay))
+
+    def with_headers(self, headers: dict) -> "RequestSpec":
+        return replace(self, headers=self.headers + tuple((k, str(v)) for k, v in headers.items()))
+
+    def with_expected_headers(self, *names: str) -> "RequestSpec":
+        return replace(self, expected_headers=self.expected_headers + names)
+
+    def with_status_code(self, status_code: int) -> "RequestSpec":
+        return replace(self, status_code=status_code)
+
+    def with_body(self, body: bytes | str) -> "RequestSpec":
+        return replace(self, body=body.encode("utf-8") if isinstance(body, str) else body)
+
+    def without_body(self) -> "RequestSpec":
+        return replace(self, no_body=True)
+
+    def without_headers(self) -> "RequestSpec":
+        return replace(self, no_headers=True)
+
+    def with_request_headers(self, headers: dict) -> "RequestSpec":
+        return replace(self, request_headers=self.request_headers + tuple((k, str(v)) for k, v in headers.items()))
+
+    def with_request_body(self, body: bytes | str) -> "RequestSpec":
+        return replace(self, request_body=body.encode("utf-8") if isinstance(body, str) else body)
+
+    def with_assert_headers(self, headers: dict) -> "RequestSpec":
+        """Require request headers; a value of None only requires the header to be present."""
+        asserted = tuple(k if v is None else f"{k}: {v}" for k, v in headers.items())
+        return replace(self, assert_headers=self.assert_headers + asserted)
+
+    def with_assert_no_headers(self, *names: str) -> "RequestSpec":
+        return replace(self, assert_no_headers=self.assert_no_headers + names)
+
+    def with_assert_method(self, method: str) -> "RequestSpec":
+        return replace(self, assert_method=method.upper())
+
+    def with_assert_content_type(self, content_type: str) -> "RequestSpec":
+        return replace(self, assert_content_type=content_type)
+
+    def with_assert_body(self, body: bytes | str) -> "RequestSpec":
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        return replace(self, assert_body_sha256=hashlib.sha256(body).hexdigest())
+
+    def with_assert_status(self, status_code: int) -> "RequestSpec":
+        return replace(self, assert_status=status_code)
+
+    # ----------------------------------------------------------------
+    # Compiled forms
+    # ----------------------------------------------------------------
+
+    @cached_property
+    def query_string(self) -> str:
+        params = []
+        if self.delay is not None:
+            params.append(f"delay={self.delay}")
+        if self.random_delay is not None:
+            low, high = self.random_delay
+            params.append(f"random_delay={'' if low is None else low},{'' if high is None else high}")
+        if self.headers:
+            params.append(f"headers={','.join(headers_p2l(self.headers))}")
+        if self.expected_headers:
+            encoded = [base64.b64encode(i.encode("utf-8")).decode("utf-8") for i in self.expected_headers]
+            params.append(f"expected_headers={','.join(encoded)}")
+        if self.status_code is not None:
+            params.append(f"status_code={self.status_code}")
+        if self.body is not None:
+            params.append(f"body={base64.b64encode(self.body).decode('utf-8')}")
+        if self.no_body:
+            params.append("no_body")
+        if self.no_headers:
+            params.append("no_headers")
+        if self.assert_headers:
+            encoded = [base64.b64encode(i.encode("utf-8")).decode("utf-8") for i in self.assert_headers]
+            params.append(f"assert_headers={','.join(encoded)}")
+        if self.assert_no_headers:
+            encoded = [base64.b64encode(i.encode("utf-8")).decode("utf-8") for i in self.assert_no_headers]
+            params.append(f"assert_no_headers={','.join(encoded)}")
+        if self.assert_method is not None:
+            params.append(f"assert_method={self.assert_method}")
+        if self.assert_content_type is not None:
+            encoded = base64.b64encode(self.assert_content_type.encode("utf-8")).decode("utf-8")
+            params.append(f"assert_content_type={encoded}")
+        if self.assert_body_sha256 is not None:
+            params.append(f"assert_body_sha256={self.assert_body_sha256}")
+        if self.assert_status is not None:
+            params.append(f"assert_status={self.assert_status}")
+        return "&".join(params)
+
+    @cached_property
+    def target(self) -> str:
+        """The path and query string, as it appears in the request line and in `url_path`."""
+        return f"{self.path}?{self.query_string}" if self.query_string else self.path
+
+    def build_request(self, host: str) -> bytes:
+        return _build_request(self, host)
+
+
+@lru_cache(maxsize=1024)
+def _build_request(spec: RequestSpec, host: str) -> bytes:
+    names = {k.lower() for k, _ in spec.request_headers}
+    lines = [f"{spec.method} {spec.target} HTTP/1.1"]
+    if "host" not in names:
+        lines.append(f"Host: {host}")
+    if "user-agent" not in names:
+        lines.append(f"User-Agent: {USER_AGENT}")
+    lines.extend(f"{k}: {v}" for k, v in spec.request_headers)
+    if spec.request_body or spec.method in METHODS_WITH_BODY:
+        lines.append(f"Content-Length: {len(spec.request_body)}")
+    head = "\r\n".join(lines) + "\r\n\r\n"
+    return head.encode("latin-1") + spec.request_body
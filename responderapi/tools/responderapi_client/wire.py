@@ -0,0 +1,44 @@
+"""HTTP/1.1 response parsing shared by the sync and async sessions."""
+
+NO_BODY = "none"
+LENGTH = "length"
+CHUNKED = "chunked"
+UNTIL_CLOSE = "close"
+
+# Safe to send twice, see RFC 9110 section 9.2.2
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"))
+
+
+class StaleConnection(ConnectionError):
+    """Raised when a connection is closed or reset before any byte of the response arrived,
+    typically because the server dropped an idle keep-alive connection.
+    """
+
+
+def parse_head(head: bytes) -> tuple[int, dict]:
+    """Parse a status line and headers terminated by an empty line. Header names are lower case."""
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    status = int(status_line.split(" ", 2)[1])
+    headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return status, headers
+
+
+def body_framing(status: int, headers: dict, head_only: bool = False) -> tuple[str, int]:
+    """Work out how the response body is delimited: not at all, by `Content-Length`, by chunked
+    transfer encoding or by the server closing the connection.
+    """
+    if head_only or status in (204, 304) or 100 <= status < 200:
+        return NO_BODY, 0
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        return CHUNKED, 0
+    if "content-length" in headers:
+        return LENGTH, int(headers["content-length"])
+    return UNTIL_CLOSE, 0
+
+
+def keeps_alive(headers: dict, framing: str) -> bool:
+    return framing != UNTIL_CLOSE and headers.get("connection", "").lower() != "close"
@@ -0,0 +1,624 @@
+"""A local stand-in for ResponderAPI.
+
+Implements the query params and the JSON response payload documented in the ResponderAPI
+README, so tests can run where the real ResponderAPI container is not available, e.g. in CI
+without network or AWS Marketplace access, or as a mock inside a cluster for high-rate
+integration tests.
+
+The server runs on a single asyncio event loop (uvloop is used when it is installed). Delays
+are timers rather than sleeping threads, so thousands of delayed requests cost next to nothing.
+Query strings are parsed once and their response headers built once; only the fields that
+change from one request to the next are filled in per request.
+
+    $ python standin.py --port 8080
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+from datetime import datetime, timezone
+from email.utils import formatdate
+from functools import lru_cache
+import hashlib
+from http import HTTPStatus
+import json
+import logging
+import random
+import sys
+import time
+from urllib.parse import unquote
+import uuid
+
+logger = logging.getLogger("responderapi")
+
+DEFAULT_CONTENT_TYPE = b"application/json"
+ERROR_CONTENT_TYPE = b"text/plain; charset=utf-8"
+MAX_HEAD_LENGTH = 65536
+PARAMS_CACHE_SIZE = 4096
+ASSERTIONS_PATH = "/_responderapi/assertions"
+ASSERT_HEADER = b"X-Responder-Assert"
+MAX_ASSERTION_REASONS = 256
+DEFAULT_ASSERT_STATUS = 417
+
+# Assigned on startup, like the responderapi_id of a ResponderAPI container
+RESPONDERAPI_ID = str(uuid.uuid1())
+
+
+class BadRequest(ValueError):
+    """Raised for requests and query params that ResponderAPI answers with 400 Bad Request."""
+
+
+# ----------------------------------------------------------------
+# Query params
+# ----------------------------------------------------------------
+
+def _b64decode(value: str, name: str) -> bytes:
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise BadRequest(f"Error: Could not decode {name}: {value}") from None
+
+
+def _int(value: str, name: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"Error: Invalid {name}: {value}") from None
+    if number < 0:
+        raise BadRequest(f"Error: Invalid {name}: {value}. Must not be negative")
+    return number
+
+
+def _status_line(status: int) -> bytes:
+    try:
+        phrase = HTTPStatus(status).phrase
+    except ValueError:
+        phrase = ""
+    return f"HTTP/1.1 {status} {phrase}\r\n".encode("latin-1")
+
+
+def _status_code(value: str) -> int:
+    if not (value.isascii() and value.isdigit()) or not 100 <= int(value) <= 599:
+        raise BadRequest(f"Error: Invalid HTTP status code: {value}")
+    return int(value)
+
+
+# Matched and mismatched assertions since startup (or the last reset), see ASSERTIONS_PATH.
+# Mismatches are counted by category (e.g. "header X-Tenant"), never by the values the client sent.
+assertion_counts = {"matched": 0, "mismatched": 0, "reasons": {}}
+
+
+class Assertion:
+    """Expectations about a request, checked by the stand-in so that clients only need to look at
+    the response status code.
+    """
+
+    __slots__ = ("required_headers", "forbidden_headers", "method", "content_type", "body_sha256", "status_line")
+
+    def __init__(self, required_headers: list[str], forbidden_headers: list[str], method: str | None,
+                 content_type: str | None, body_sha256: str | None, status: int):
+        self.required_headers = []
+        for i in required_headers:
+            name, sep, value = i.partition(":")
+            self.required_headers.append((name.strip().lower(), name.strip(), value.strip() if sep else None))
+        self.forbidden_headers = [(i.lower(), i) for i in forbidden_headers]
+        self.method = method
+        self.content_type = content_type
+        self.body_sha256 = body_sha256.lower() if body_sha256 else None
+        self.status_line = _status_line(status)
+
+    def check(self, request: "Request") -> tuple[str, str] | None:
+        """Return the category and the reason for the first mismatch, or None if the request is as
+        expected. Only the reason contains values taken from the request.
+        """
+        if self.method is not None and request.method != self.method:
+            return "method", f"method {request.method} != {self.method}"
+        headers = request.headers
+        for lower, name, value in self.required_headers:
+            if lower not in headers:
+                return f"header {name}", f"missing header {name}"
+            if value is not None and headers[lower] != value:
+                return f"header {name}", f"header {name}: {headers[lower]} != {value}"
+        for lower, name in self.forbidden_headers:
+            if lower in headers:
+                return f"forbidden header {name}", f"forbidden header {name}"
+        if self.content_type is not None and headers.get("content-type") != self.content_type:
+            return "content type", f"content type {headers.get('content-type', '')} != {self.content_type}"
+        if self.body_sha256 is not None and hashlib.sha256(request.body).hexdigest() != self.body_sha256:
+            return "body sha256", "body sha256 mismatch"
+        return None
+
+
+class Params:
+    """Query params of a request, decoded and validated, with the parts of the response that only
+    depend on them (status line, response headers, custom body) already built.
+    """
+
+    __slots__ = (
+        "delay", "random_delay", "headers", "expected_headers", "status_code", "body", "no_body",
+        "no_headers", "assertion", "params_json", "status_line", "header_block", "fixed_length",
+    )
+
+    def __init__(self, query_string: str):
+        self.delay = None
+        self.random_delay = {}
+        self.headers = None
+        self.expected_headers = None
+        self.status_code = None
+        self.body = None
+        self.no_body = False
+        self.no_headers = False
+        self.assertion = None
+        body_b64 = None
+        assert_params = {}
+
+        for pair in query_string.split("&") if query_string else ():
+            name, sep, value = pair.partition("=")
+            value = unquote(value)
+            if name == "delay":
+                self.delay = _int(value, "delay")
+            elif name == "random_delay":
+                self.random_delay = self._parse_random_delay(value)
+            elif name == "headers":
+                self.headers = [
+                    _b64decode(i, "response header").decode("utf-8", "replace") for i in value.split(",") if i
+                ]
+                for i in self.headers:
+                    if ":" not in i:
+                        raise BadRequest(f"Error: Invalid response header: {i}")
+            elif name == "expected_headers":
+                self.expected_headers = [
+                    _b64decode(i, "expected header").decode("utf-8", "replace").strip() for i in value.split(",") if i
+                ]
+            elif name == "status_code":
+                self.status_code = _status_code(value)
+            elif name == "body":
+                body_b64 = value
+                self.body = _b64decode(value, "response body")
+            elif name == "no_body":
+                self.no_body = True
+            elif name == "no_headers":
+                self.no_headers = True
+            elif name in ("assert_headers", "assert_no_headers"):
+                assert_params[name] = [
+                    _b64decode(i, "asserted header").decode("utf-8", "replace").strip() for i in value.split(",") if i
+                ]
+            elif name == "assert_method":
+                assert_params[name] = value.upper()
+            elif name == "assert_content_type":
+                assert_params[name] = _b64decode(value, "asserted content type").decode("utf-8", "replace")
+            elif name == "assert_body_sha256":
+                if len(value) != 64 or not all(i in "0123456789abcdefABCDEF" for i in value):
+                    raise BadRequest(f"Error: Invalid SHA-256 digest: {value}")
+                assert_params[name] = value
+            elif name == "assert_status":
+                assert_params[name] = _status_code(value)
+
+        if assert_params:
+            self.assertion = Assertion(
+                assert_params.get("assert_headers", []),
+                assert_params.get("assert_no_headers", []),
+                assert_params.get("assert_method"),
+                assert_params.get("assert_content_type"),
+                assert_params.get("assert_body_sha256"),
+                assert_params.get("assert_status", DEFAULT_ASSERT_STATUS),
+            )
+
+        params = {}
+        if self.delay is not None:
+            params["delay"] = self.delay
+        params["random_delay"] = self.random_delay
+        if self.headers is not None:
+            params["headers"] = self.headers
+        if self.no_headers:
+            params["no_headers"] = True
+        if self.expected_headers is not None:
+            params["expected_headers"] = self.expected_headers
+        if self.status_code is not None:
+            params["status_code"] = self.status_code
+        if body_b64 is not None:
+            params["body"] = body_b64
+        if self.no_body:
+            params["no_body"] = True
+        params.update(assert_params)
+        self.params_json = json.dumps(params, separators=(",", ":"))
+
+        self.status_line = _status_line(self.status_code or 200)
+        self.header_block, self.fixed_length = self._build_header_block()
+
+    @staticmethod
+    def _parse_random_delay(value: str) -> dict:
+        low, sep, high = value.partition(",")
+        if not sep:
+            low, high = "", low
+        random_delay = {}
+        if low:
+            random_delay["min"] = _int(low, "random_delay")
+        if high:
+            random_delay["max"] = _int(high, "random_delay")
+        # A missing value is assumed to be zero
+        if random_delay.get("min", 0) > random_delay.get("max", 0):
+            raise BadRequest(f"Error: Invalid random_delay: {value}. min must not be greater than max")
+        return random_delay
+
+    def _build_header_block(self) -> tuple[bytes, bool]:
+        """Response headers other than Date and Content-Length, and whether Content-Length was set
+        with the `headers` param.
+        """
+        lines = []
+        fixed_length = False
+        content_type = not self.no_body
+        if not self.no_headers:
+            for i in self.headers or ():
+                name, _, value = i.partition(":")
+                name = name.strip()
+                if name.lower() == "content-type":
+                    content_type = False
+                elif name.lower() == "content-length":
+                    fixed_length = True
+                lines.append(f"{name}: {value.strip()}\r\n".encode("latin-1", "replace"))
+        if content_type:
+            lines.insert(0, b"Content-Type: " + DEFAULT_CONTENT_TYPE + b"\r\n")
+        return b"".join(lines), fixed_length
+
+    def response_delay(self) -> float:
+        """Delay in seconds, including a random delay if one was requested."""
+        delay = self.delay or 0
+        if self.random_delay:
+            delay += random.randint(self.random_delay.get("min", 0), self.random_delay.get("max", 0))
+        return delay / 1000
+
+
+@lru_cache(maxsize=PARAMS_CACHE_SIZE)
+def parse_params(query_string: str) -> Params:
+    return Params(query_string)
+
+
+# ----------------------------------------------------------------
+# Responses
+# ----------------------------------------------------------------
+
+_date_cache = [0, b""]
+
+
+def date_header() -> bytes:
+    """The Date header line, formatted at most once a second."""
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache[0] = now
+        _date_cache[1] = b"Date: " + formatdate(now, usegmt=True).encode("latin-1") + b"\r\n"
+    return _date_cache[1]
+
+
+def has_body(method: str, status: int) -> bool:
+    return method != "HEAD" and status not in (204, 304) and not 100 <= status < 200
+
+
+def build_response(params: Params, method: str, body: bytes, mismatch: str | None = None) -> bytes:
+    status_line, header_block = params.status_line, params.header_block
+    if mismatch is not None:
+        status_line = params.assertion.status_line
+        reason = mismatch.encode("latin-1", "replace").replace(b"\r", b" ").replace(b"\n", b" ")
+        header_block += ASSERT_HEADER + b": " + reason + b"\r\n"
+    if not has_body(method, int(status_line[9:12])):
+        return status_line + header_block + date_header() + b"\r\n"
+    if params.fixed_length:
+        return status_line + header_block + date_header() + b"\r\n" + body
+    return b"".join((
+        status_line, header_block, date_header(),
+        b"Content-Length: ", str(len(body)).encode("latin-1"), b"\r\n\r\n", body,
+    ))
+
+
+def json_response(data: dict) -> bytes:
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return b"".join((
+        b"HTTP/1.1 200 OK\r\nContent-Type: ", DEFAULT_CONTENT_TYPE, b"\r\n", date_header(),
+        b"Content-Length: ", str(len(body)).encode("latin-1"), b"\r\n\r\n", body,
+    ))
+
+
+def error_response(message: str, status: int = 400) -> bytes:
+    body = message.encode("utf-8")
+    return b"".join((
+        _status_line(status), b"Content-Type: ", ERROR_CONTENT_TYPE, b"\r\n", date_header(),
+        b"Content-Length: ", str(len(body)).encode("latin-1"), b"\r\n\r\n", body,
+    ))
+
+
+# ----------------------------------------------------------------
+# Requests
+# ----------------------------------------------------------------
+
+class Request:
+    """A parsed HTTP/1.x request. Header names in `headers` are lower case; `raw_headers` keeps
+    them as sent.
+    """
+
+    __slots__ = ("method", "target", "protocol", "raw_headers", "headers", "body", "keep_alive")
+
+    def __init__(self, head: bytes):
+        try:
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            self.method, self.target, self.protocol = request_line.split(" ")
+        except ValueError:
+            raise BadRequest("Error: Invalid HTTP request line") from None
+        self.raw_headers = []
+        self.headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise BadRequest(f"Error: Invalid HTTP header: {line}")
+            name, value = name.strip(), value.strip()
+            self.raw_headers.append((name, value))
+            self.headers[name.lower()] = value
+        self.body = b""
+        connection = self.headers.get("connection", "").lower()
+        if self.protocol == "HTTP/1.0":
+            self.keep_alive = connection == "keep-alive"
+        else:
+            self.keep_alive = connection != "close"
+
+    def find_headers(self, names: list[str]) -> list[str] | None:
+        found = [f"{i}: {v}" for i in names for n, v in self.raw_headers if n.lower() == i.lower()]
+        return found or None
+
+
+def decode_chunked(buffer: bytearray) -> tuple[bytes, int] | None:
+    """Decode a chunked request body at the start of `buffer`. Returns the body and the number of
+    bytes it took up, or None if the body has not been received in full yet.
+    """
+    chunks = []
+    pos = 0
+    while True:
+        end = buffer.find(b"\r\n", pos)
+        if end < 0:
+            return None
+        try:
+            size = int(bytes(buffer[pos:end]).split(b";")[0], 16)
+        except ValueError:
+            size = -1
+        if size < 0:
+            raise BadRequest("Error: Invalid chunked request body")
+        pos = end + 2
+        if size == 0:
+            # Skip trailers up to the empty line that ends the body
+            while True:
+                end = buffer.find(b"\r\n", pos)
+                if end < 0:
+                    return None
+                if end == pos:
+                    return b"".join(chunks), end + 2
+                pos = end + 2
+        if len(buffer) < pos + size + 2:
+            return None
+        chunks.append(bytes(buffer[pos:pos + size]))
+        pos += size + 2
+
+
+class ResponderProtocol(asyncio.Protocol):
+    """One client connection. Requests are answered in order; while a delayed response is pending,
+    pipelined requests wait in the buffer.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.client_address = ""
+        self.buffer = bytearray()
+        self.request = None
+        self.busy = False
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        peer = transport.get_extra_info("peername")
+        if peer:
+            host, port = peer[0], peer[1]
+            self.client_address = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        if not self.busy:
+            self.process()
+
+    def process(self):
+        while not self.busy and self.transport is not None:
+            try:
+                if self.request is None:
+                    end = self.buffer.find(b"\r\n\r\n")
+                    if end < 0:
+                        if len(self.buffer) > MAX_HEAD_LENGTH:
+                            raise BadRequest("Error: Request headers too large")
+                        return
+                    self.request = Request(bytes(self.buffer[:end]))
+                    del self.buffer[:end + 4]
+
+                request = self.request
+                if request.headers.get("transfer-encoding", "").lower() == "chunked":
+                    decoded = decode_chunked(self.buffer)
+                    if decoded is None:
+                        return
+                    request.body, consumed = decoded
+                    del self.buffer[:consumed]
+                else:
+                    length = request.headers.get("content-length", "0")
+                    if not (length.isascii() and length.isdigit()):
+                        raise BadRequest("Error: Invalid Content-Length")
+                    length = int(length)
+                    if len(self.buffer) < length:
+                        return
+                    request.body = bytes(self.buffer[:length])
+                    del self.buffer[:length]
+            except BadRequest as e:
+                self.close_with(error_response(str(e)))
+                return
+
+            self.request = None
+            try:
+                self.handle(request)
+            except Exception:
+                self.fail(request)
+
+    def handle(self, request: Request):
+        started = time.perf_counter_ns()
+        called_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        path, _, query_string = request.target.partition("?")
+        if path == ASSERTIONS_PATH:
+            self.respond(request, self.assertions(query_string))
+            return
+        try:
+            params = parse_params(query_string)
+        except BadRequest as e:
+            logger.info(str(e))
+            self.respond(request, error_response(str(e)))
+            return
+
+        echo = {"protocol": request.protocol, "method": request.method}
+        headers = request.headers
+        if "user-agent" in headers:
+            echo["user_agent"] = headers["user-agent"]
+        echo["client_address"] = self.client_address
+        if "host" in headers:
+            echo["host"] = headers["host"]
+        echo["url_path"] = request.target
+        if headers.get("content-type"):
+            echo["content_type"] = headers["content-type"]
+        if request.body:
+            echo["content_length"] = len(request.body)
+            echo["request_body"] = base64.b64encode(request.body).decode("ascii")
+        if params.expected_headers:
+            found_headers = request.find_headers(params.expected_headers)
+            if found_headers:
+                echo["found_headers"] = found_headers
+        mismatch = None
+        if params.assertion is not None:
+            result = params.assertion.check(request)
+            if result is None:
+                assertion_counts["matched"] += 1
+            else:
+                category, mismatch = result
+                assertion_counts["mismatched"] += 1
+                reasons = assertion_counts["reasons"]
+                # Header names come from query strings too; keep the counters bounded regardless
+                if category not in reasons and len(reasons) >= MAX_ASSERTION_REASONS:
+                    category = "other"
+                reasons[category] = reasons.get(category, 0) + 1
+            echo["assertion"] = mismatch or "passed"
+
+        # Requests are logged before the response is delayed, so they show up even if the client gives up
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(self.serialise(echo, params, called_at, started).decode("utf-8"))
+
+        delay = params.response_delay()
+        if delay > 0:
+            self.busy = True
+            asyncio.get_running_loop().call_later(
+                delay, self.finish_delayed, request, params, echo, called_at, started, mismatch
+            )
+        else:
+            self.finish(request, params, echo, called_at, started, mismatch)
+
+    def finish(self, request: Request, params: Params, echo: dict, called_at: str, started: int,
+               mismatch: str | None = None):
+        if params.no_body:
+            body = b""
+        elif params.body is not None:
+            body = params.body
+        else:
+            body = self.serialise(echo, params, called_at, started)
+        self.respond(request, build_response(params, request.method, body, mismatch))
+
+    def finish_delayed(self, request: Request, *args):
+        """Timer callback for delayed responses: answer, then resume the pipelined requests that
+        waited in the buffer. Undelayed responses are answered from the loop in process().
+        """
+        try:
+            self.finish(request, *args)
+        except Exception:
+            self.fail(request)
+            return
+        if self.buffer:
+            self.process()
+
+    def fail(self, request: Request):
+        """Answer a request that raised an unexpected error with 500 and close the connection, so
+        one bad request cannot leave the client waiting.
+        """
+        logger.exception(f"Error handling {request.method} {request.target}")
+        self.busy = False
+        self.close_with(error_response("Error: Internal server error", 500))
+
+    def close_with(self, response: bytes):
+        if self.transport is not None:
+            self.transport.write(response)
+            self.transport.close()
+            self.transport = None
+
+    @staticmethod
+    def assertions(query_string: str) -> bytes:
+        """Assertion counters; `?reset` sets them back to zero after reading them."""
+        response = json_response(assertion_counts)
+        if "reset" in query_string.split("&"):
+            assertion_counts.update(matched=0, mismatched=0, reasons={})
+        return response
+
+    @staticmethod
+    def serialise(echo: dict, params: Params, called_at: str, started: int) -> bytes:
+        execution_time = max((time.perf_counter_ns() - started) // 1000, 1)
+        return "".join((
+            json.dumps(echo, separators=(",", ":"))[:-1], ',"params":', params.params_json,
+            ',"responderapi_id":"', RESPONDERAPI_ID, '","called_at":"', called_at,
+            '","execution_time":', str(execution_time), "}",
+        )).encode("utf-8")
+
+    def respond(self, request: Request, response: bytes):
+        self.busy = False
+        if self.transport is None:
+            return
+        self.transport.write(response)
+        if not request.keep_alive:
+            self.transport.close()
+            self.transport = None
+
+
+# ----------------------------------------------------------------
+# Running the stand-in
+# ----------------------------------------------------------------
+
+async def serve(host: str = "0.0.0.0", port: int = 8080, reuse_port: bool = False) -> asyncio.AbstractServer:
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(ResponderProtocol, host, port, reuse_port=reuse_port or None)
+
+
+async def _run(host: str, port: int):
+    server = await serve(host, port)
+    logger.warning(f"ResponderAPI stand-in {RESPONDERAPI_ID} listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--log-level", default="INFO", help="use WARNING to stop logging every request")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(message)s", stream=sys.stdout)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    try:
+        asyncio.run(_run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
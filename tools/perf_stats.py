@@ -0,0 +1,8 @@
+"""Statistics shared by the performance tools of the QRlyAPI and ResponderAPI test suites."""
+import math
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(math.ceil(round(p * len(values) / 100, 9)), 1)
+    return values[rank - 1]
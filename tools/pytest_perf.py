@@ -0,0 +1,292 @@
+"""Performance regression checks for the QRlyAPI and ResponderAPI test suites.
+
+With `--perf`, every request a test makes through `requests` or `http.client` is timed on the
+client, up to the end of the response body, and the server-side `execution_time` is taken from
+the JSON response payload when there is one. Streamed `requests` responses (`stream=True`) and
+`http.client` responses are timed when the test has read the whole body with `read()`, e.g.
+through `resp.raw` or `shutil.copyfileobj`; a body the test never reads is not recorded.
+Responses without a body are timed when their headers arrive. Per-test p50/p95 are compared
+with a baseline file and the run fails when they regress by more than the threshold.
+
+    $ pytest --perf --perf-repeat 5 --perf-save     # record a baseline
+    $ pytest --perf --perf-repeat 5                 # compare with it
+
+The test suites load this plugin from their conftest.py. It can also be loaded into any other
+test run with `-p pytest_perf`, if this folder is on PYTHONPATH.
+"""
+from datetime import datetime, timezone
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from perf_stats import percentile
+
+PLUGIN_NAME = "perf-recorder"
+DEFAULT_BASELINE = ".perf_baseline.json"
+PERCENTILES = (50, 95)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "performance regression checks")
+    # Both test suites register the plugin; only add the options once when they run together
+    if any("--perf" in option.names() for option in group.options):
+        return
+    group.addoption("--perf", action="store_true", help="record client and server time of every request")
+    group.addoption("--perf-repeat", type=int, default=1, metavar="N", help="run each test N times")
+    group.addoption("--perf-baseline", metavar="PATH", help=f"baseline file, {DEFAULT_BASELINE} in rootdir by default")
+    group.addoption("--perf-save", action="store_true", help="save the results as the new baseline")
+    group.addoption(
+        "--perf-threshold", type=float, default=0.2, metavar="RATIO",
+        help="fail when p50 or p95 is more than RATIO slower than the baseline (default: 0.2)",
+    )
+    group.addoption(
+        "--perf-min-delta", type=float, default=1.0, metavar="MS",
+        help="ignore regressions smaller than MS milliseconds (default: 1.0)",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("perf", False) and not config.pluginmanager.has_plugin(PLUGIN_NAME):
+        config.pluginmanager.register(PerfRecorder(config), PLUGIN_NAME)
+
+
+# ----------------------------------------------------------------
+# Statistics
+# ----------------------------------------------------------------
+
+def summarise(values: list[float]) -> dict | None:
+    if not values:
+        return None
+    values = sorted(values)
+    summary = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    summary["count"] = len(values)
+    return summary
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta: float) -> list[str]:
+    """Return a description of every p50/p95 (in seconds) that regressed against the baseline."""
+    regressions = []
+    for test, metrics in sorted(current.items()):
+        for metric, summary in metrics.items():
+            base = baseline.get(test, {}).get(metric)
+            if not summary or not base:
+                continue
+            for p in PERCENTILES:
+                key = f"p{p}"
+                delta = summary[key] - base[key]
+                if delta > base[key] * threshold and delta * 1000 > min_delta:
+                    regressions.append(
+                        f"{test} {metric} {key}: {summary[key] * 1000:.3f}ms "
+                        f"(baseline {base[key] * 1000:.3f}ms, +{delta / base[key]:.0%})"
+                    )
+    return regressions
+
+
+def server_time(body: bytes) -> float | None:
+    """`execution_time` (microseconds) from a JSON response payload, in seconds."""
+    if not body.startswith(b"{"):
+        return None
+    try:
+        execution_time = json.loads(body).get("execution_time")
+        return None if execution_time is None else int(execution_time) / 1_000_000
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+# ----------------------------------------------------------------
+# Recording
+# ----------------------------------------------------------------
+
+class PerfRecorder:
+    """Times the requests made by each test and checks them against the baseline at the end of the
+    run.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.repeat = max(config.getoption("perf_repeat"), 1)
+        self.threshold = config.getoption("perf_threshold")
+        self.min_delta = config.getoption("perf_min_delta")
+        self.baseline_path = config.getoption("perf_baseline") or os.path.join(config.rootpath, DEFAULT_BASELINE)
+        self.save = config.getoption("perf_save")
+        self.samples: dict[str, dict[str, list[float]]] = {}
+        self.regressions: list[str] = []
+        self.saved = False
+        self.current = None
+        self.local = threading.local()
+        self.patches = []
+
+    # Hooks
+
+    def pytest_generate_tests(self, metafunc):
+        if self.repeat > 1:
+            metafunc.fixturenames.append("_perf_repeat")
+            metafunc.parametrize("_perf_repeat", range(self.repeat), ids=[f"perf{i}" for i in range(self.repeat)])
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        self.current = self.test_name(item)
+        self.samples.setdefault(self.current, {"client": [], "server": []})
+        try:
+            yield
+        finally:
+            self.current = None
+
+    def pytest_sessionstart(self, session):
+        self.install()
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.uninstall()
+        results = self.results()
+        if self.save:
+            # A failed run must not quietly become the reference
+            if session.exitstatus == pytest.ExitCode.OK:
+                self.save_baseline(results)
+                self.saved = True
+            return
+        baseline = self.load_baseline()
+        if baseline is None:
+            return
+        self.regressions = compare(results, baseline, self.threshold, self.min_delta)
+        if self.regressions and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.section("performance")
+        for test, metrics in sorted(self.results().items()):
+            line = [test]
+            for metric, summary in metrics.items():
+                if summary:
+                    line.append(f"{metric} p50 {summary['p50'] * 1000:.3f}ms p95 {summary['p95'] * 1000:.3f}ms")
+            terminalreporter.write_line("  ".join(line))
+        if self.saved:
+            terminalreporter.write_line(f"baseline saved to {self.baseline_path}")
+        elif self.save:
+            terminalreporter.write_line("baseline not saved because the tests did not pass", yellow=True)
+        elif not os.path.exists(self.baseline_path):
+            terminalreporter.write_line(f"no baseline at {self.baseline_path}, use --perf-save to create one")
+        for regression in self.regressions:
+            terminalreporter.write_line(f"REGRESSION {regression}", red=True)
+
+    # Results
+
+    def test_name(self, item) -> str:
+        """Node id of the test without the repeat parameter, so repeated runs are pooled."""
+        nodeid = item.nodeid
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None and "_perf_repeat" in callspec.params:
+            repeat_id = f"perf{callspec.params['_perf_repeat']}"
+            nodeid = nodeid.replace(f"[{repeat_id}]", "").replace(f"-{repeat_id}]", "]")
+        return nodeid
+
+    def record(self, client: float, server: float | None):
+        if self.current is None:
+            return
+        samples = self.samples[self.current]
+        samples["client"].append(client)
+        if server is not None:
+            samples["server"].append(server)
+
+    def results(self) -> dict:
+        return {
+            test: {metric: summarise(values) for metric, values in samples.items()}
+            for test, samples in self.samples.items()
+            if samples["client"]
+        }
+
+    def load_baseline(self) -> dict | None:
+        if not os.path.exists(self.baseline_path):
+            return None
+        with open(self.baseline_path) as file:
+            return json.load(file)["tests"]
+
+    def save_baseline(self, results: dict):
+        baseline = {"created_at": datetime.now(timezone.utc).isoformat(), "repeat": self.repeat, "tests": results}
+        with open(self.baseline_path, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+
+    # Instrumentation
+
+    def install(self):
+        recorder = self
+
+        def time_body(resp: http.client.HTTPResponse, started: float):
+            """Record the request now if the response has no body, otherwise once the test has
+            read the whole body (see timed_read).
+            """
+            if resp.isclosed() or resp.length == 0:
+                recorder.record(time.perf_counter() - started, None)
+            else:
+                resp._perf_started = started
+                resp._perf_body = []
+
+        try:
+            import requests
+        except ImportError:
+            requests = None
+        if requests is not None:
+            send = requests.Session.send
+
+            def timed_send(session, request, **kwargs):
+                recorder.local.in_requests = True
+                started = time.perf_counter()
+                try:
+                    resp = send(session, request, **kwargs)
+                finally:
+                    recorder.local.in_requests = False
+                if not kwargs.get("stream"):
+                    recorder.record(time.perf_counter() - started, server_time(resp.content))
+                    return resp
+                # Streamed bodies belong to the test, reading them here would consume them
+                fp = getattr(resp.raw, "_fp", None)
+                if isinstance(fp, http.client.HTTPResponse):
+                    time_body(fp, started)
+                else:
+                    recorder.record(time.perf_counter() - started, None)
+                return resp
+
+            self.patch(requests.Session, "send", timed_send)
+
+        request = http.client.HTTPConnection.request
+        getresponse = http.client.HTTPConnection.getresponse
+        read = http.client.HTTPResponse.read
+
+        def timed_request(conn, *args, **kwargs):
+            conn._perf_started = time.perf_counter()
+            return request(conn, *args, **kwargs)
+
+        def timed_getresponse(conn, *args, **kwargs):
+            resp = getresponse(conn, *args, **kwargs)
+            started = getattr(conn, "_perf_started", None)
+            conn._perf_started = None
+            # Requests made through `requests` are timed by timed_send
+            if started is not None and not getattr(recorder.local, "in_requests", False):
+                time_body(resp, started)
+            return resp
+
+        def timed_read(resp, *args, **kwargs):
+            data = read(resp, *args, **kwargs)
+            started = getattr(resp, "_perf_started", None)
+            if started is not None:
+                resp._perf_body.append(data)
+                if resp.isclosed() or not data:
+                    resp._perf_started = None
+                    recorder.record(time.perf_counter() - started, server_time(b"".join(resp._perf_body)))
+            return data
+
+        self.patch(http.client.HTTPConnection, "request", timed_request)
+        self.patch(http.client.HTTPConnection, "getresponse", timed_getresponse)
+        self.patch(http.client.HTTPResponse, "read", timed_read)
+
+    def patch(self, owner, name: str, replacement):
+        self.patches.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, replacement)
+
+    def uninstall(self):
+        while self.patches:
+            owner, name, original = self.patches.pop()
+            setattr(owner, name, original)